@@ -1,80 +1,109 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import collections
+import functools
 import os
 import re
 import sys
-import time
+from typing import Iterator
 
-PAREN_RE   = re.compile(r"\([^)]*\)")     # ( ... )
-BRACKET_RE = re.compile(r"\[[^\]]*\]")    # [ ... ]
-SPACE_RE   = re.compile(r"\s+")
-# earliest sentence end; we’ll consume one sentence at a time as soon as we see . ? !
-END_RE     = re.compile(r"[.!?]")
+from tailing import compiled_main, event_wait, open_source, reopen
 
-def clean_text(s: str) -> str:
+# ( ... ), [ ... ] and whitespace in one alternation, so a run of asides and
+# the spaces around them collapses to a single space in one pass
+CLEAN_RE   = re.compile(r"(?:\([^)]*\)|\[[^\]]*\]|\s)+")
+# sentence terminators; every . ? ! in the buffer closes one sentence
+# (matched on the raw bytes buffer; the terminators are ASCII so UTF-8 is safe to split there)
+END_RE     = re.compile(rb"[.!?]")
+
+# how many recently emitted sentences are remembered for duplicate suppression;
+# whisper re-sends its sliding window, so repeats arrive close together
+RECENT_MAX = 64
+
+# cleaned results are memoized for fragments up to this length; ASR keeps
+# re-sending the same short partials, while long ones would only bloat the cache
+CLEAN_CACHE_MAX_LEN = 2048
+
+def _clean_text_nocache(s: str) -> str:
     # remove parenthetical / bracketed asides and collapse whitespace
-    s = PAREN_RE.sub(" ", s)
-    s = BRACKET_RE.sub(" ", s)
-    s = SPACE_RE.sub(" ", s)
-    return s.strip(" \t\r\n")
+    return CLEAN_RE.sub(" ", s).strip(" \t\r\n")
+
+_clean_text_cached = functools.lru_cache(maxsize=4096)(_clean_text_nocache)
+
+def clean_text(s: str) -> str:
+    if len(s) > CLEAN_CACHE_MAX_LEN:
+        return _clean_text_nocache(s)
+    return _clean_text_cached(s)
 
-def follow_file(path: str, poll: float):
+def follow_file(path: str, poll: float) -> Iterator[bytes]:
     """
-    Generator yielding newly appended text from a file (like `tail -f`).
+    Generator yielding newly appended bytes from a file (like `tail -f`).
     Starts at current end if file exists; creates file if missing.
+    Reopens the file from the top if it is rotated or replaced.
     """
-    # ensure file exists
-    open(path, "a").close()
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        f.seek(0, os.SEEK_END)  # start tailing from current end
-        buf = ""
+    fd = open_source(path)
+    try:
+        os.lseek(fd, 0, os.SEEK_END)  # start tailing from current end
         while True:
-            chunk = f.read()
+            chunk = os.read(fd, 65536)
             if chunk:
-                buf += chunk
-                yield buf
-                buf = ""  # hand off everything we just saw
-            else:
-                time.sleep(poll)
-
-def process_stream(source_path: str, out_path: str, poll: float):
-    # track sentences we’ve already emitted (case-insensitive) to avoid duplicates
+                yield chunk
+            elif event_wait(path, fd, poll):
+                # path now names a different file: read the new one from the top
+                fd = reopen(path, fd)
+    finally:
+        os.close(fd)
+
+def process_stream(source_path: str, out_path: str, poll: float) -> None:
+    # track sentences we’ve recently emitted (case-insensitive) to avoid duplicates:
+    # the set gives O(1) membership, the deque evicts the oldest once full
     seen = set()
+    seen_order = collections.deque()
 
     # also process any existing content from the start once, so you don’t miss early lines
-    with open(source_path, "r", encoding="utf-8", errors="ignore") as f:
+    with open(source_path, "rb") as f:
         initial = f.read()
-    buffer = initial
+    # undecoded bytes; sentences are decoded one at a time as they are cut off
+    buffer = bytearray(initial)
+
+    # one O_APPEND descriptor for the whole run; each sentence is a single write
+    out_fd = os.open(out_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    atexit.register(os.close, out_fd)
 
-    def flush_sentence(raw_sentence: str):
+    def flush_sentence(raw_sentence: str) -> None:
         s = clean_text(raw_sentence)
         key = s.lower()
         if not s:
             return
         if key in seen:
             return
-        with open(out_path, "a", encoding="utf-8") as out:
-            out.write(s + "\n")
-            out.flush()
+        os.write(out_fd, (s + "\n").encode("utf-8"))
+        if len(seen_order) == RECENT_MAX:
+            seen.discard(seen_order.popleft())
+        seen_order.append(key)
         seen.add(key)
         # optional: also show in stdout for quick feedback
         print(s, flush=True)
 
+    # bytes at the front of `buffer` already scanned and known to hold no terminator
+    scanned = 0
+
     # helper to pull complete sentences from buffer
-    def drain_complete_sentences():
-        nonlocal buffer
-        while True:
-            m = END_RE.search(buffer)
-            if not m:
-                break
-            end_idx = m.end()  # include the terminator
-            sent = buffer[:end_idx]
-            buffer = buffer[end_idx:]  # keep remainder for later
-            flush_sentence(sent)
+    def drain_complete_sentences() -> None:
+        nonlocal scanned
+        # one scan over the unseen bytes only, then a single trim of the consumed prefix
+        ends = [m.end() for m in END_RE.finditer(buffer, scanned)]  # include the terminator
+        prev = 0
+        for end_idx in ends:
+            flush_sentence(buffer[prev:end_idx].decode("utf-8", "ignore"))
+            prev = end_idx
+        del buffer[:prev]  # keep remainder for later
 
         # keep buffer small by trimming runaway whitespace
         if len(buffer) > 10000:
-            buffer = buffer[-5000:]
+            del buffer[:-5000]
+        scanned = len(buffer)
 
     # process any existing content first
     drain_complete_sentences()
@@ -96,10 +125,9 @@ def main():
     parser.add_argument("--poll", type=float, default=0.5, help="Polling interval in seconds (default: 0.5)")
     args = parser.parse_args()
 
-    # touch output so it exists
-    open(args.out, "a").close()
-
     process_stream(args.source, args.out, args.poll)
 
 if __name__ == "__main__":
+    # SONARE_USE_CYTHON=1 hands off to the Cython build (see setup.py) if it is up to date
+    main = compiled_main("clean_transcript", __file__) or main
     main()
@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
-import argparse, json, os, re, sys, time
-from typing import List, Dict, Any
+import argparse, functools, json, re, sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tailing import AppendWriter, compiled_main, follow_lines
+
+# ---------- optional orjson (native JSON encoder) ----------
+try:
+    import orjson
+except Exception:
+    orjson = None
 
 # ---------- optional spaCy pipeline ----------
 USE_SPACY = True
@@ -12,7 +20,6 @@ except Exception:
     spacy = None
 
 WORD_RE = re.compile(r"[A-Za-z0-9']+")
-APOSTROPHE_RE = re.compile(r"[’`]")
 SPACE_RE = re.compile(r"\s+")
 
 # Common mappings from spoken forms -> gloss keys (UPPERCASE).
@@ -60,17 +67,29 @@ CUSTOM_MAP = {
     # add more domain words as needed
 }
 
+# simple stopword-ish filter for the rule-based fallback
+DROP = frozenset({"THE","A","AN","OF","TO","IN","ON","AT","FOR","AND","OR","BUT","WITH","BE"})
+
 # POS tags we usually keep in gloss (content words)
 KEEP_POS = {"NOUN", "PROPN", "VERB", "AUX", "ADJ", "ADV", "INTJ", "PRON", "NUM"}
 
-def load_lexicons(path: str) -> Dict[str, Dict[str, Any]]:
+# compiled lexicon entry: (label, asset, dur_ms)
+LexEntry = Tuple[str, Optional[str], int]
+
+def load_lexicons(path: str) -> Dict[str, LexEntry]:
+    """Load lexicons.json keyed by UPPERCASE gloss, each entry pre-unpacked to a tuple."""
     with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        raw = json.load(f)
+    return {
+        k.upper(): (v.get("label", k.upper()), v.get("asset"), v.get("dur_ms", 1000))
+        for k, v in raw.items() if v
+    }
 
+@functools.lru_cache(maxsize=4096)
 def normalize_token(tok: str) -> str:
-    tok = tok.lower()
-    tok = APOSTROPHE_RE.sub("'", tok)
-    return tok
+    # str.replace hands back the same object when there's nothing to fold,
+    # which beats entering the regex engine for a two-char class
+    return tok.lower().replace("’", "'").replace("`", "'")
 
 def basic_lemma(tok: str) -> str:
     # super-light lemmatizer: strip simple endings
@@ -123,70 +142,77 @@ def sent_to_gloss_spacy(nlp, text: str) -> List[str]:
             dedup.append(g)
     return dedup
 
+@functools.lru_cache(maxsize=8192)
+def basic_token_gloss(word: str) -> Optional[str]:
+    """Gloss for one raw WORD_RE match, or None if it is a dropped stopword."""
+    t = normalize_token(word)
+    g = CUSTOM_MAP.get(t)
+    if g is None:
+        g = basic_lemma(t).upper()
+    return None if g in DROP else g
+
 def sent_to_gloss_basic(text: str) -> List[str]:
-    toks = [normalize_token(t) for t in WORD_RE.findall(text)]
-    glosses: List[str] = []
-    for t in toks:
-        if t in CUSTOM_MAP:
-            glosses.append(CUSTOM_MAP[t])
-            continue
-        lem = basic_lemma(t).upper()
-        glosses.append(lem)
-    # simple stopword-ish filter
-    DROP = {"THE","A","AN","OF","TO","IN","ON","AT","FOR","AND","OR","BUT","WITH","BE"}
-    glosses = [g for g in glosses if g not in DROP]
+    # one C-level tokenize, then a single cached lookup + inline dedupe per word
     dedup: List[str] = []
-    for g in glosses:
-        if not dedup or dedup[-1] != g:
-            dedup.append(g)
+    last = None
+    for word in WORD_RE.findall(text):
+        g = basic_token_gloss(word)
+        if g is None or g == last:
+            continue
+        dedup.append(g)
+        last = g
     return dedup
 
-def follow_lines(path: str, poll: float):
-    """Tail a file and yield lines as they are appended (handles partial lines)."""
-    open(path, "a").close()
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        # process existing lines first
-        pending = f.read()
-        if pending:
-            for line in pending.splitlines():
-                yield line
-        # now tail
-        buf = ""
-        while True:
-            chunk = f.read()
-            if chunk:
-                buf += chunk
-                while "\n" in buf:
-                    line, buf = buf.split("\n", 1)
-                    yield line
-            else:
-                time.sleep(poll)
+QueueMapper = Callable[[List[str], Dict[str, LexEntry]], List[Dict[str, Any]]]
+
+def make_queue_mapper(tween_ms: int, rate: float) -> QueueMapper:
+    """
+    Build map_gloss_to_queue specialized for fixed settings: the rate
+    reciprocal, the shared tween object and the tween branch are resolved
+    once here instead of on every sentence.
+    """
+    inv_rate = 1.0 / max(rate, 0.01)
 
-def map_gloss_to_queue(gloss: List[str], lex: Dict[str, Dict[str, Any]],
+    if not tween_ms:
+        def mapper(gloss: List[str], lex: Dict[str, LexEntry]) -> List[Dict[str, Any]]:
+            queue: List[Dict[str, Any]] = []
+            for g in gloss:
+                # glosses are already UPPERCASE, same as the compiled lexicon keys
+                entry = lex.get(g)
+                if entry is not None:
+                    label, asset, dur_src = entry
+                    queue.append({"label": label, "type": "clip", "asset": asset,
+                                  "dur_ms": int(round(dur_src * inv_rate))})
+                # silently skip OOV tokens
+            return queue
+        return mapper
+
+    # one tween object shared by every gap; it is only ever read by the serializer
+    tween = {"label": "_TWEEN", "type": "meta", "dur_ms": tween_ms}
+
+    def mapper(gloss: List[str], lex: Dict[str, LexEntry]) -> List[Dict[str, Any]]:
+        queue: List[Dict[str, Any]] = []
+        last_i = len(gloss) - 1
+        for i, g in enumerate(gloss):
+            entry = lex.get(g)
+            if entry is not None:
+                label, asset, dur_src = entry
+                queue.append({"label": label, "type": "clip", "asset": asset,
+                              "dur_ms": int(round(dur_src * inv_rate))})
+                if i < last_i:
+                    queue.append(tween)
+        return queue
+    return mapper
+
+def map_gloss_to_queue(gloss: List[str], lex: Dict[str, LexEntry],
                        tween_ms: int, rate: float) -> List[Dict[str, Any]]:
-    queue: List[Dict[str, Any]] = []
-    for i, g in enumerate(gloss):
-        key = g.lower()  # your lexicons.json keys look lowercase in your example
-        entry = lex.get(key)
-        if not entry:
-            # try direct uppercase key or stripped variants
-            entry = lex.get(g) or lex.get(g.lower())
-        if entry:
-            dur = int(round(entry.get("dur_ms", 1000) / max(rate, 0.01)))
-            queue.append({
-                "label": entry.get("label", g),
-                "type": "clip",
-                "asset": entry.get("asset"),
-                "dur_ms": dur
-            })
-            if tween_ms and i < len(gloss) - 1:
-                queue.append({"label": "_TWEEN", "type": "meta", "dur_ms": tween_ms})
-        # silently skip OOV tokens
-    return queue
-
-def write_jsonl(path: str, obj: Dict[str, Any]):
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+    return make_queue_mapper(tween_ms, rate)(gloss, lex)
+
+def dumps(obj: Dict[str, Any]) -> bytes:
+    """Serialize to compact UTF-8 JSON; the stdlib fallback matches orjson's output."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 def main():
     ap = argparse.ArgumentParser(description="Tail clean transcript, gloss with spaCy (or fallback), and emit sign queues.")
@@ -201,6 +227,8 @@ def main():
     args = ap.parse_args()
 
     lex = load_lexicons(args.lex)
+    writer = AppendWriter(args.out)
+    map_queue = make_queue_mapper(args.tween_ms, args.rate)
 
     use_spacy = USE_SPACY and not args.no_spacy
     nlp = spacy_pipeline() if use_spacy else None
@@ -213,8 +241,14 @@ def main():
     last_line = None
 
     try:
-        for line in follow_lines(args.source, args.poll):
-            line = SPACE_RE.sub(" ", line).strip()
+        for raw in follow_lines(args.source, args.poll, on_idle=writer.flush):
+            # clean_transcript already collapses whitespace, so usually the only
+            # whitespace left is single ASCII spaces (isprintable() is False for
+            # every other whitespace char) and the regex can be skipped
+            if raw.isprintable() and "  " not in raw:
+                line = raw.strip(" ")
+            else:
+                line = SPACE_RE.sub(" ", raw).strip()
             if not line:
                 continue
             if line == last_line:
@@ -222,7 +256,7 @@ def main():
             last_line = line
 
             gloss = sent_to_gloss_spacy(nlp, line) if use_spacy else sent_to_gloss_basic(line)
-            queue = map_gloss_to_queue(gloss, lex, tween_ms=args.tween_ms, rate=args.rate)
+            queue = map_queue(gloss, lex)
 
             obj = {
                 "input": line,
@@ -230,10 +264,14 @@ def main():
                 "queue": queue,
                 "sentence_pause_ms": args.sentence_pause_ms
             }
-            write_jsonl(args.out, obj)
+            writer.write(dumps(obj) + b"\n")
             print(f"[glossify] {line} -> {gloss} ({len(queue)} items)")
     except KeyboardInterrupt:
         print("\n[glossify] stopped.", file=sys.stderr)
+    finally:
+        writer.close()
 
 if __name__ == "__main__":
+    # SONARE_USE_CYTHON=1 hands off to the Cython build (see setup.py) if it is up to date
+    main = compiled_main("glossify_transcript", __file__) or main
     main()
@@ -0,0 +1,26 @@
+"""
+Optional ahead-of-time build of the pipeline scripts with Cython.
+
+    pip install cython
+    python setup.py build_ext --inplace
+
+This produces _clean_transcript_c, _glossify_transcript_c and
+_stream_queue_assets_c extension modules next to the scripts. The scripts
+only hand off to their compiled twin when SONARE_USE_CYTHON=1 is set, and
+skip a build that is older than the .py (the .so files are gitignored, so
+a stale build wouldn't show up in git status). Without it they run as plain
+Python, so the build is never required.
+"""
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+SCRIPTS = ["clean_transcript", "glossify_transcript", "stream_queue_assets"]
+
+setup(
+    name="speech-to-sign-speedups",
+    ext_modules=cythonize(
+        [Extension(f"_{name}_c", [f"{name}.py"]) for name in SCRIPTS],
+        build_dir="build",
+        compiler_directives={"language_level": 3, "boundscheck": False},
+    ),
+)
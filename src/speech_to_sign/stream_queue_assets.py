@@ -1,37 +1,27 @@
 #!/usr/bin/env python3
-import argparse, json, os, sys, time
+import argparse, json, sys
+from typing import List
 
-def follow_lines(path: str, poll: float):
-    open(path, "a").close()
-    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-        # emit existing lines first
-        pending = f.read()
-        if pending:
-            for line in pending.splitlines():
-                yield line
-        # then tail
-        buf = ""
-        while True:
-            chunk = f.read()
-            if chunk:
-                buf += chunk
-                while "\n" in buf:
-                    line, buf = buf.split("\n", 1)
-                    yield line
-            else:
-                time.sleep(poll)
+from tailing import AppendWriter, compiled_main, follow_lines
 
-def process_line(line: str, last_label: list):
+# optional native JSON parser; its JSONDecodeError subclasses json's
+try:
+    import orjson
+    loads = orjson.loads
+except Exception:
+    loads = json.loads
+
+def process_line(line: str, last_label: list) -> List[str]:
     """Return list of assets (strings) with adjacent dedupe."""
     line = line.strip()
     if not line:
         return []
     try:
-        obj = json.loads(line)
+        obj = loads(line)
     except json.JSONDecodeError:
         return []
     queue = obj.get("queue", [])
-    out_assets = []
+    out_assets: List[str] = []
     for item in queue:
         if item.get("type") != "clip":
             continue
@@ -56,26 +46,19 @@ def main():
 
     last_label = [None]
 
-    if args.out:
-        open(args.out, "a").close()
-
+    # --out is optional; stdout always gets a copy for visibility
+    writer = AppendWriter(args.out, echo=sys.stdout.buffer)
     try:
-        for line in follow_lines(args.source, args.poll):
+        for line in follow_lines(args.source, args.poll, on_idle=writer.flush):
             assets = process_line(line, last_label)
-            if not assets:
-                continue
-            if args.out:
-                with open(args.out, "a", encoding="utf-8") as f:
-                    for a in assets:
-                        f.write(a + "\n")
-                # also echo to stdout for visibility
-                for a in assets:
-                    print(a, flush=True)
-            else:
-                for a in assets:
-                    print(a, flush=True)
+            if assets:
+                writer.write(("\n".join(assets) + "\n").encode("utf-8"))
     except KeyboardInterrupt:
         pass
+    finally:
+        writer.close()
 
 if __name__ == "__main__":
+    # SONARE_USE_CYTHON=1 hands off to the Cython build (see setup.py) if it is up to date
+    main = compiled_main("stream_queue_assets", __file__) or main
     main()
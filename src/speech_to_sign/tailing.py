@@ -0,0 +1,234 @@
+"""Shared helpers for the pipeline scripts in this directory: tailing their
+input files, coalescing appends to their output files, and handing off to
+their optional Cython builds."""
+import ctypes, ctypes.util, importlib, os, select, struct, sys, time
+from typing import BinaryIO, Callable, Dict, Generator, Iterator, Optional, Tuple
+
+# inotify(7) constants (linux/inotify.h)
+IN_MODIFY      = 0x00000002
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF   = 0x00000800
+IN_NONBLOCK    = os.O_NONBLOCK
+IN_CLOEXEC     = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (name follows)
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        _libc = None
+
+def replay_lines(fd: int) -> Generator[str, None, int]:
+    """
+    Yield the complete lines already in the file behind `fd`, reading it in
+    one pread and walking the newlines with find() instead of splitlines().
+    Returns the offset just past the last newline; a trailing partial line
+    (or anything a short read left behind) is picked up by the tailer.
+    """
+    # a private copy rather than an mmap: the consumer may take seconds per
+    # line, and a mapping held across yields dies with SIGBUS if the file is
+    # truncated meanwhile
+    data = os.pread(fd, os.fstat(fd).st_size, 0)
+    pos = 0
+    nl = data.find(b"\n")
+    while nl != -1:
+        yield data[pos:nl].decode("utf-8", "ignore")
+        pos = nl + 1
+        nl = data.find(b"\n", pos)
+    return pos
+
+# path -> (inotify fd, wd on the file, wd on its parent dir)
+_watches: Dict[str, Tuple[int, int, int]] = {}
+
+def _add_file_watch(fd: int, path: str) -> int:
+    return _libc.inotify_add_watch(fd, os.fsencode(path), IN_MODIFY | IN_MOVE_SELF | IN_DELETE_SELF)
+
+def _watch(path: str):
+    w = _watches.get(path)
+    if w is not None:
+        return w
+    fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        return None
+    file_wd = _add_file_watch(fd, path)
+    parent = os.path.dirname(os.path.abspath(path))
+    dir_wd = _libc.inotify_add_watch(fd, os.fsencode(parent), IN_CREATE | IN_MOVED_TO)
+    if file_wd < 0 or dir_wd < 0:
+        os.close(fd)
+        return None
+    w = _watches[path] = (fd, file_wd, dir_wd)
+    return w
+
+def _replaced(path: str, fd: int) -> bool:
+    # True only if `path` now names a different file than the open `fd`;
+    # a missing path means "keep reading the old fd until something appears"
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    cur = os.fstat(fd)
+    return (st.st_ino, st.st_dev) != (cur.st_ino, cur.st_dev)
+
+def reopen(path: str, fd: int) -> int:
+    """Swap `fd` for a fresh read-only fd on `path`; keeps `fd` if the path is gone."""
+    try:
+        new_fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return fd
+    os.close(fd)
+    return new_fd
+
+def event_wait(path: str, fd: int, timeout: float) -> bool:
+    """
+    Block until `path` changes or `timeout` seconds pass.
+    Returns True if `path` now names a different file than the open `fd`
+    (rotated or recreated), meaning the caller should reopen it; False for
+    plain appends, timeouts, and while the path is missing.
+    Uses inotify on Linux and falls back to sleep + stat elsewhere.
+    """
+    w = _watch(path) if _libc is not None else None
+    if w is None:
+        time.sleep(timeout)
+        return _replaced(path, fd)
+    ifd, file_wd, dir_wd = w
+    ready, _, _ = select.select([ifd], [], [], timeout)
+    if not ready:
+        return False
+    name = os.fsencode(os.path.basename(path))
+    moved = False
+    while True:
+        try:
+            data = os.read(ifd, 4096)
+        except BlockingIOError:
+            break
+        pos = 0
+        while pos < len(data):
+            wd, mask, _cookie, ln = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            ev_name = data[pos:pos + ln].rstrip(b"\0")
+            pos += ln
+            if wd == file_wd and mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                moved = True
+            elif wd == dir_wd and ev_name == name:
+                moved = True
+    # events only say *something* happened to the name; the inodes decide
+    if not moved or not _replaced(path, fd):
+        return False
+    # follow whatever now lives at `path`
+    _libc.inotify_rm_watch(ifd, file_wd)
+    _watches[path] = (ifd, _add_file_watch(ifd, path), dir_wd)
+    return True
+
+def open_source(path: str) -> int:
+    # raw read-only fd; creates the file if missing
+    return os.open(path, os.O_RDONLY | os.O_CREAT, 0o644)
+
+def follow_lines(path: str, poll: float,
+                 on_idle: Optional[Callable[[], None]] = None) -> Iterator[str]:
+    """
+    Tail a file and yield lines as they are appended (handles partial lines).
+    Lines already in the file are replayed first.
+    `on_idle` is called each time the reader has caught up and is about to wait.
+    """
+    fd = open_source(path)
+    try:
+        # process existing lines first
+        pos = yield from replay_lines(fd)
+        os.lseek(fd, pos, os.SEEK_SET)
+        # now tail
+        buf = bytearray()
+        while True:
+            chunk = os.read(fd, 65536)
+            if chunk:
+                buf += chunk
+                # walk the newlines in place and trim the consumed prefix once
+                start = 0
+                i = buf.find(b"\n")
+                while i != -1:
+                    yield buf[start:i].decode("utf-8", "ignore")
+                    start = i + 1
+                    i = buf.find(b"\n", start)
+                del buf[:start]
+            else:
+                if on_idle is not None:
+                    on_idle()
+                if event_wait(path, fd, poll):
+                    # path now names a different file: read the new one from the top
+                    fd = reopen(path, fd)
+                    buf.clear()
+    finally:
+        os.close(fd)
+
+def _write_all(fd: int, data: bytes) -> None:
+    # os.write may stop short (signal, full disk, FIFO): keep going until it's all out
+    with memoryview(data) as view:
+        done = 0
+        while done < len(view):
+            done += os.write(fd, view[done:])
+
+class AppendWriter:
+    """
+    Append bytes to `path` (if given) and optionally echo them to `echo`,
+    coalescing them into few writes. Buffered data goes out once `max_bytes`
+    have piled up or `max_delay` seconds have passed since the last write,
+    and on every flush() call (callers pass flush as follow_lines' on_idle,
+    so live output isn't held back).
+    """
+    def __init__(self, path: Optional[str], echo: Optional[BinaryIO] = None,
+                 max_bytes: int = 65536, max_delay: float = 0.1):
+        # O_APPEND makes each os.write land as whole records at the end of the file
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644) if path else None
+        self.echo = echo
+        self.buf = bytearray()
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.last_flush = time.monotonic()
+
+    def write(self, data: bytes) -> None:
+        self.buf += data
+        if len(self.buf) >= self.max_bytes or time.monotonic() - self.last_flush >= self.max_delay:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buf:
+            # detach the pending bytes first: if a sink raises (e.g. BrokenPipeError
+            # on stdout), a later flush()/close() must not append them to the file again
+            data = bytes(self.buf)
+            self.buf.clear()
+            if self.fd is not None:
+                _write_all(self.fd, data)
+            if self.echo is not None:
+                self.echo.write(data)
+                self.echo.flush()
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+        if self.fd is not None:
+            os.close(self.fd)
+
+def compiled_main(name: str, script: str) -> Optional[Callable[[], None]]:
+    """
+    Return `main` from the Cython build `_<name>_c` (see setup.py), but only
+    when SONARE_USE_CYTHON=1 is set and the build is newer than `script`.
+    Returns None otherwise, and the caller runs its own pure-Python main.
+    """
+    if os.environ.get("SONARE_USE_CYTHON") != "1":
+        return None
+    try:
+        mod = importlib.import_module(f"_{name}_c")
+    except ImportError:
+        return None
+    built = getattr(mod, "__file__", None)
+    if not built or os.path.getmtime(built) < os.path.getmtime(script):
+        print(f"[{name}] ignoring stale Cython build {built}; re-run setup.py build_ext --inplace",
+              file=sys.stderr)
+        return None
+    return mod.main